@@ -1,9 +1,13 @@
 import os
 from .angle import Angle
-from .excel import ExcelSave, sheetSetup
+from .excel import ExcelSave, sheetSetup, summarySheet
 from .roi import ROI
+from .detector import Detector
 from .orgData import CreateDF
 from .compute import Compute
+from .database import AngleDatabase
+from .render import PlotRenderer
+from .framestore import FrameStore, FrameWriter
 
 
 # Define a function to initialize directory structure
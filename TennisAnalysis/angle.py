@@ -2,21 +2,29 @@ import numpy as np
 import math
 import matplotlib.pyplot as plt
 from TennisAnalysis import excel, orgData
+from TennisAnalysis.database import AngleDatabase
 
 '''Note: In this z-axis is the FrontView (Blue), 
 the x-axis is the SideView (Red) and the y-axis is the TopView (Green)'''
 
+# Landmark triples of the measured joints, left side first, and the color of each in the plots
+ANGLES = [[11, 13, 15], [13, 11, 23], [11, 24, 23], [23, 24, 26], [24, 26, 28],
+          [12, 14, 16], [14, 12, 24], [12, 23, 24], [24, 23, 25], [23, 25, 27],
+          ]
+COLORS = ["midnightblue", "darkgreen", "darkred", "olive", "teal",
+          "deepskyblue", "springgreen", "coral", "gold", "steelblue"]
+
 
 class Angle:
     """Calculates angles in 3 dimensions for the specified joints."""
 
     def __init__(self, **kwargs):
-        self.angles = [[11, 13, 15], [13, 11, 23], [11, 24, 23], [23, 24, 26], [24, 26, 28],
-                       [12, 14, 16], [14, 12, 24], [12, 23, 24], [24, 23, 25], [23, 25, 27],
-                       ]
+        self.angles = ANGLES
         self.filename = kwargs['filename']
         self.side = kwargs['side'].lower()
-        self.df = orgData.CreateDF(self.side, self.filename)
+        self.player = kwargs.get('player')
+        self.recorded = kwargs.get('recorded')  # Capture date of the session for the database
+        self.df = orgData.CreateDF(self.side, self.filename, kwargs.get('memory_budget'))
         self.norm = self.x_flat = self.y_flat = self.z_flat = None
         self.xFlatAngle = self.yFlatAngle = self.zFlatAngle = self.normAngle = None
 
@@ -62,10 +70,7 @@ class Angle:
     def drawLines(self, ax):  # internal Usage
         """Used for visualization in the plots by connecting the joints"""
 
-        colorList = ["midnightblue", "darkgreen", "darkred", "olive", "teal",
-                     "deepskyblue", "springgreen", "coral", "gold", "steelblue"]
-
-        for points, color in zip(self.angles, colorList):
+        for points, color in zip(self.angles, COLORS):
             for i in range(len(points) - 1):
                 ax.plot([self.z_flat[points[i]][0], self.z_flat[points[i+1]][0]],
                         [self.z_flat[points[i]][1], self.z_flat[points[i+1]][1]],
@@ -132,8 +137,8 @@ class Angle:
         print("\n(Black)NormAngles:")
         [print(f"{key}: {value}") for key, value in self.normAngle.items()]
 
-    def save_values(self, pic):
-        """Uses the excel.py file to save the angle inside the Excel sheet."""
+    def rows(self):
+        """Returns the [Frame of Force, Frame of Stability] rows of the last calculated angles."""
 
         s1Vals = []
         s2Vals = []
@@ -143,13 +148,40 @@ class Angle:
             s1Vals.extend(list(subList)[:5])
             s2Vals.extend(list(subList)[5:10])
         if self.side == "left":
-            self.df.add_values(pic, [s1Vals, s2Vals])
+            return [s1Vals, s2Vals]
         else:
-            self.df.add_values(pic, [s2Vals, s1Vals])
+            return [s2Vals, s1Vals]
+
+    def save_values(self, pic):
+        """Uses the excel.py file to save the angle inside the Excel sheet."""
+
+        self.df.add_values(pic, self.rows())
 
-    def save_files(self):
-        wb = excel.ExcelSave(self.filename, self.side)
-        wb.addValues(0, self.df.FOF)
-        wb.addValues(1, self.df.FOS)
-        wb.workbook.close()
+    def save_files(self, database=None):
+        """Saves the Excel sheet and CSV files. If a database path (or AngleDatabase) is given,
+            the angle rows are also stored there for cross-session queries, dated by the recorded
+            keyword of Angle (defaults to the time of saving)."""
+
+        if self.df.chunk_rows is None:
+            wb = excel.ExcelSave(self.filename, self.side)
+            wb.addValues(0, self.df.FOF)
+            wb.addValues(1, self.df.FOS)
+            wb.workbook.close()
+        # In memory-bounded mode this also writes the workbook, streamed from the CSV files
         self.df.save_as_csv()
+
+        if database is not None:
+            db = database if isinstance(database, AngleDatabase) else AngleDatabase(database)
+            try:
+                if self.df.chunk_rows is None:
+                    db.addSession(self.filename, self.side, self.df.FOF, self.df.FOS, player=self.player,
+                                  recorded=self.recorded)
+                else:
+                    force_file_path, stability_file_path = self.df.csv_paths()
+                    db.addSession(self.filename, self.side, self.df.chunks(force_file_path),
+                                  self.df.chunks(stability_file_path), player=self.player,
+                                  recorded=self.recorded)
+            finally:
+                # Only close a database opened here
+                if db is not database:
+                    db.close()
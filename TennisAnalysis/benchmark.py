@@ -0,0 +1,96 @@
+"""Compares detector configurations against the YOLOv3 player selection used by ROI.
+Reports the time per frame and how often each configuration produces the same crop."""
+
+import os
+import time
+import pandas as pd
+from .detector import Detector, readImage
+
+
+def loadFrames(folder):
+    """Reads every image in a folder once so that disk access is not part of the timings"""
+    frames = {}
+    for filename in sorted(os.listdir(folder)):
+        if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff')):
+            frames[filename] = readImage(os.path.join(folder, filename))
+    return frames
+
+
+def cropBoxes(detector, frames):
+    """Returns the crop box chosen by the detector for every frame and the average time per frame in ms"""
+    # The first forward pass allocates the network buffers, keep it out of the timings
+    detector.detect(next(iter(frames.values())))
+
+    boxes = {}
+    start = time.perf_counter()
+    for filename, image in frames.items():
+        box = detector.detect(image)
+        boxes[filename] = None if box is None else detector.cropBox(box, image.shape[1], image.shape[0])
+    elapsed = time.perf_counter() - start
+    return boxes, 1000 * elapsed / len(frames)
+
+
+def labelFrames(folder, labels_file=None):
+    """Labels a frame set with the crop boxes of the default YOLOv3 detector.
+        The labels can be saved as a CSV and reused with compareDetectors."""
+    frames = loadFrames(folder)
+    if not frames:
+        raise ValueError(f"No images found in {folder}")
+    boxes, _ = cropBoxes(Detector(), frames)
+    labels = pd.DataFrame.from_dict({name: box if box is not None else [None] * 4 for name, box in boxes.items()},
+                                    orient="index", columns=["x", "y", "w", "h"])
+    if labels_file is not None:
+        labels.to_csv(labels_file)
+    return labels
+
+
+def iou(box1, box2):
+    """Intersection over union of two [x, y, w, h] boxes"""
+    x1, y1 = max(box1[0], box2[0]), max(box1[1], box2[1])
+    x2 = min(box1[0] + box1[2], box2[0] + box2[2])
+    y2 = min(box1[1] + box1[3], box2[1] + box2[3])
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    union = box1[2] * box1[3] + box2[2] * box2[3] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def compareDetectors(folder, configs, labels=None):
+    """Runs each configuration over the frames in a folder.
+        configs is a list of keyword dictionaries for Detector, e.g. {"weights": "yolov3-tiny.weights",
+        "config": "yolov3-tiny.cfg", "size": 320}. labels is a DataFrame or CSV from labelFrames; if
+        not given, the frames are labeled with the default YOLOv3 detector first."""
+
+    frames = loadFrames(folder)
+    if not frames:
+        raise ValueError(f"No images found in {folder}")
+
+    if labels is None:
+        reference, _ = cropBoxes(Detector(), frames)
+    else:
+        if isinstance(labels, str):
+            labels = pd.read_csv(labels, index_col=0)
+        reference = {name: None if row.isna().any() else tuple(int(v) for v in row)
+                     for name, row in labels.iterrows()}
+
+    results = []
+    for config in configs:
+        detector = Detector(**config)
+        boxes, ms = cropBoxes(detector, frames)
+
+        same, overlaps = 0, []
+        for filename, box in boxes.items():
+            expected = reference.get(filename)
+            if box is None or expected is None:
+                same += box is None and expected is None
+                overlaps.append(1.0 if box is None and expected is None else 0.0)
+            else:
+                same += tuple(box) == tuple(expected)
+                overlaps.append(iou(box, expected))
+
+        results.append({"detector": detector.name(),
+                        "ms/frame": round(ms, 2),
+                        "same crop": round(same / len(frames), 3),
+                        "mean IoU": round(sum(overlaps) / len(overlaps), 3),
+                        "min IoU": round(min(overlaps), 3)})
+
+    return pd.DataFrame(results).set_index("detector").sort_values("ms/frame")
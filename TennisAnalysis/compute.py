@@ -6,13 +6,18 @@ from .excel import sheetSetup
 
 
 class Compute:
-    def __init__(self, frame, filename, side, csv_file):
+    def __init__(self, frame, filename, side, csv_file, chunksize=None):
+        """With a chunksize the CSV is processed in chunks and the Excel sheet is left to excel.streamWorkbook"""
         self.frame = frame
         self.filename = filename
         self.side = side
         self.csv_file = csv_file
-        self.compute_csv()
-        self.save_to_excel()
+        self.chunksize = chunksize
+        if chunksize is None:
+            self.compute_csv()
+            self.save_to_excel()
+        else:
+            self.compute_csv_chunked()
 
     @staticmethod
     def add_columns_to_the_right(df, original_col, rounded_col_name, deviation_col_name, rounded_values,
@@ -46,6 +51,53 @@ class Compute:
         new_df.to_csv(new_csv_file)
         self.csv_file = new_csv_file
 
+    def compute_csv_chunked(self):
+        """Same output as compute_csv, but only one chunk of rows is in memory. The first pass sums the
+            rounded values per column for the means, the second writes the rounded and deviation columns."""
+
+        def chunks():
+            return pd.read_csv(self.csv_file, header=[0, 1], index_col=0, chunksize=self.chunksize)
+
+        # An empty session has the header but no chunks, the means are then NaN
+        header = pd.read_csv(self.csv_file, header=[0, 1], index_col=0, nrows=0)
+        sums = pd.Series(0.0, index=header.columns)
+        counts = pd.Series(0, index=header.columns)
+        for df in chunks():
+            rounded = round(df / 10)
+            sums = sums + rounded.sum()
+            counts = counts + rounded.count()
+        means = sums / counts.where(counts > 0)
+
+        new_csv_file = self.csv_file.replace('.csv', '_processed.csv')
+        written = False
+        for df in chunks():
+            self.processed_chunk(df, means).to_csv(new_csv_file, mode='a' if written else 'w', header=not written)
+            written = True
+        if not written:
+            # Still write the header so the exports can read the file
+            self.processed_chunk(header, means).to_csv(new_csv_file)
+        self.csv_file = new_csv_file
+
+    def processed_chunk(self, df, means):
+        """Adds the rounded and deviation columns to one chunk of rows"""
+        new_df = pd.DataFrame(index=df.index, columns=df.columns)
+        for col in df.columns:
+            new_df[col] = df[col]
+            rounded_column = round(df[col] / 10)
+            deviation_column = round(rounded_column - means[col], 2)
+
+            rounded_col_name = (col[0], f'rounded_{col[1]}')
+            deviation_col_name = (col[0], f'{col[1]}_deviation')
+
+            new_df = self.add_columns_to_the_right(new_df, col, rounded_col_name, deviation_col_name,
+                                                   rounded_column,
+                                                   deviation_column)
+        return new_df
+
+    def chunks(self):
+        """Reads the processed CSV back in chunks"""
+        return pd.read_csv(self.csv_file, header=[0, 1], index_col=0, chunksize=self.chunksize)
+
     def save_to_excel(self):
         df = pd.read_csv(self.csv_file, index_col=0, header=[0, 1])
         filename = os.path.join(
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+VIEWS = ["FrontView", "TopView", "SideView", "NormView"]
+JOINTS = ["Elbow", "Shoulder", "UpHip", "DownHip", "Knee"]
+# The 20 angle columns in the CreateDF order
+COLUMNS = [f"{view}_{joint}" for view in VIEWS for joint in JOINTS]
+
+
+class AngleDatabase:
+    """Local SQLite store of the angle rows of every session, so sessions and players can be compared
+        without opening the Excel and CSV files one by one.
+
+        sessions holds one row per session (player, side, capture date), pictures one row per picture and
+        frame of reference with the 20 angles as REAL columns named like FrontView_Elbow."""
+
+    views = VIEWS
+    joints = JOINTS
+    columns = COLUMNS
+    opposite = {"left": "right", "right": "left"}
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(os.path.dirname(__file__), '../AnalyzedAngles', "angles.db")
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.createTables()
+
+    def createTables(self):
+        """Create the tables and their indexes if they do not exist"""
+        angles = ", ".join(f"{column} REAL" for column in self.columns)
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY,
+                    session TEXT NOT NULL UNIQUE,
+                    player TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    recorded TEXT NOT NULL,
+                    ingested TEXT NOT NULL
+                )""")
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS pictures (
+                    session_id INTEGER NOT NULL REFERENCES sessions (id),
+                    frame TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    picture TEXT NOT NULL,
+                    {angles},
+                    PRIMARY KEY (session_id, frame, row)
+                ) WITHOUT ROWID""")
+            # Covers the grouping and filter keys, so picking the sessions of a query never reads the table
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sessions_side_player "
+                                    "ON sessions (side, player, recorded, session, id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sessions_player "
+                                    "ON sessions (player, recorded, side, session, id)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_sessions_recorded "
+                                    "ON sessions (recorded, side, player, session, id)")
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def playerName(session):
+        """'Serve Dataset/Swiatek-R' -> 'Swiatek'"""
+        return os.path.basename(session).rsplit('-', 1)[0]
+
+    @staticmethod
+    def timestamp(value):
+        return value.isoformat(timespec="seconds") if isinstance(value, datetime) else value
+
+    def labels(self, side, frame):
+        """Column labels of CreateDF for a session of this side, e.g. leftElbow, rightUpHip"""
+        hand = side if frame == "force" else self.opposite[side]
+        return [f"{self.opposite[hand] if i % 5 > 1 else hand}{self.joints[i % 5]}" for i in range(20)]
+
+    def addSession(self, session, side, force, stability, player=None, recorded=None):
+        """Store the Frame of Force and Frame of Stability DataFrames of a CreateDF, or iterables of
+            DataFrame chunks of them. recorded is the capture date of the session and defaults to now.
+            Storing a session again replaces its previous rows."""
+
+        player = player or self.playerName(session)
+        ingested = datetime.now()
+        recorded = self.timestamp(recorded or ingested)
+
+        def rows(session_id):
+            for frame, chunks in [("force", force), ("stability", stability)]:
+                row = 0
+                for df in [chunks] if isinstance(chunks, pd.DataFrame) else chunks:
+                    # SQLite stores the NaN of missing angles as NULL
+                    values = df.to_numpy(dtype=float).tolist()
+                    for picture, angles in zip(df.index, values):
+                        yield (session_id, frame, row, str(picture), *angles)
+                        row += 1
+
+        # One transaction for the whole session
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO sessions (session, player, side, recorded, ingested) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (session) DO UPDATE SET player = excluded.player, side = excluded.side, "
+                "recorded = excluded.recorded, ingested = excluded.ingested",
+                (session, player, side, recorded, self.timestamp(ingested)))
+            session_id, = self.connection.execute("SELECT id FROM sessions WHERE session = ?", (session,)).fetchone()
+            self.connection.execute("DELETE FROM pictures WHERE session_id = ?", (session_id,))
+            self.connection.executemany(f"INSERT INTO pictures VALUES ({', '.join('?' * 24)})", rows(session_id))
+
+    def where(self, **filters):
+        """Builds a WHERE clause over the sessions (s) and pictures (p) from the filters that are not None"""
+        clauses, params = [], []
+        for key, value in filters.items():
+            if value is None:
+                continue
+            if key == "since":
+                clauses.append("s.recorded >= ?")
+            elif key == "until":
+                clauses.append("s.recorded < ?")
+            elif key == "frame":
+                clauses.append("p.frame = ?")
+            else:
+                clauses.append(f"s.{key} = ?")
+            params.append(self.timestamp(value))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def selected(self, view=None, joint=None):
+        """Positions of the angle columns that match the view and joint filters"""
+        if view is not None and view not in self.views:
+            raise ValueError(f"Unknown view '{view}'")
+        if joint is not None and joint not in self.joints:
+            raise ValueError(f"Unknown joint '{joint}'")
+        return [i for i in range(20) if view in (None, self.views[i // 5]) and joint in (None, self.joints[i % 5])]
+
+    def sessions(self):
+        """Lists the stored sessions"""
+        return pd.read_sql_query("SELECT s.session, s.player, s.side, s.recorded, s.ingested, "
+                                 "(SELECT COUNT(*) FROM pictures p WHERE p.session_id = s.id AND p.frame = 'force') "
+                                 "AS pictures FROM sessions s ORDER BY s.recorded", self.connection)
+
+    def angles(self, session=None, player=None, side=None, frame="force", view=None, joint=None,
+               since=None, until=None):
+        """Returns the stored angle rows in the CreateDF layout, one row per picture.
+            The index is the picture, with the session added in front when more than one session matches.
+            When both sides match, the columns use the side-free joint names like aggregate does."""
+
+        if frame not in ("force", "stability"):
+            raise ValueError(f"frame must be 'force' or 'stability', got {frame!r}")
+
+        selected = self.selected(view, joint)
+        clause, params = self.where(session=session, player=player, side=side, frame=frame,
+                                    since=since, until=until)
+        df = pd.read_sql_query(f"SELECT s.session, s.side, p.picture, "
+                               f"{', '.join('p.' + self.columns[i] for i in selected)} "
+                               f"FROM pictures p JOIN sessions s ON s.id = p.session_id{clause} "
+                               f"ORDER BY s.session, p.row", self.connection, params=params)
+
+        sides = df["side"].unique()
+        labels = self.labels(sides[0], frame) if len(sides) == 1 else self.joints * 4
+        table = df.set_index(["session", "picture"] if df["session"].nunique() > 1 else "picture")
+        table = table[[self.columns[i] for i in selected]].astype(float)
+        table.columns = pd.MultiIndex.from_tuples([(self.views[i // 5], labels[i]) for i in selected])
+        return table
+
+    def aggregate(self, stat="avg", by="player", side=None, player=None, session=None, frame="force",
+                  view=None, joint=None, since=None, until=None):
+        """Aggregates angles per view and joint, grouped by player, session or side.
+            stat is any SQLite aggregate (avg, min, max, count, sum). Columns follow the CreateDF
+            layout but use the side-free joint names since the groups can mix handedness."""
+
+        if by not in ("player", "session", "side"):
+            raise ValueError(f"Cannot group by '{by}'")
+        if stat.lower() not in ("avg", "min", "max", "count", "sum"):
+            raise ValueError(f"Unknown aggregate '{stat}'")
+
+        selected = self.selected(view, joint)
+        clause, params = self.where(session=session, player=player, side=side, frame=frame,
+                                    since=since, until=until)
+        table = pd.read_sql_query(f"SELECT s.{by}, "
+                                  f"{', '.join(f'{stat}(p.{self.columns[i]})' for i in selected)} "
+                                  f"FROM pictures p JOIN sessions s ON s.id = p.session_id{clause} "
+                                  f"GROUP BY s.{by} ORDER BY s.{by}", self.connection, params=params, index_col=by)
+        table.columns = pd.MultiIndex.from_tuples([(self.views[i // 5], self.joints[i % 5]) for i in selected])
+        return table
@@ -0,0 +1,173 @@
+import os
+import cv2
+import numpy as np
+import matplotlib.pyplot as plt
+
+YOLO_DIR = os.path.join(os.path.dirname(__file__), 'YOLOFiles')
+
+BACKENDS = {
+    "default": cv2.dnn.DNN_BACKEND_DEFAULT,
+    "opencv": cv2.dnn.DNN_BACKEND_OPENCV,
+    "openvino": cv2.dnn.DNN_BACKEND_INFERENCE_ENGINE,
+}
+
+TARGETS = {
+    "cpu": cv2.dnn.DNN_TARGET_CPU,
+    "cpu_fp16": getattr(cv2.dnn, "DNN_TARGET_CPU_FP16", None),  # Only in newer OpenCV builds
+    "opencl": cv2.dnn.DNN_TARGET_OPENCL,
+    "opencl_fp16": cv2.dnn.DNN_TARGET_OPENCL_FP16,
+}
+
+
+def readImage(path):
+    """Reads an image as 8-bit RGB without an alpha channel"""
+    image = plt.imread(path)
+    # Convert image to the right format
+    if image.dtype == np.float32:
+        image = (image * 255).astype(np.uint8)
+
+    # Check if the image has an alpha channel (4 channels)
+    if image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
+    return image
+
+
+class Detector:
+    """Finds the player in a frame using a YOLO model loaded through OpenCV's dnn module.
+        Model files, input size, backend and target can be changed to trade accuracy for speed."""
+
+    def __init__(self, weights="yolov3.weights", config="yolov3.cfg", size=416, backend="default", target="cpu"):
+        if size % 32 != 0:
+            raise ValueError(f"YOLO input size must be a multiple of 32, got {size}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {list(BACKENDS)}")
+        if target not in TARGETS:
+            raise ValueError(f"Unknown target '{target}', expected one of {list(TARGETS)}")
+
+        self.weights = self.modelPath(weights)
+        self.config = self.modelPath(config)
+        self.size = size
+        self.backend = backend
+        self.target = target
+        self.classes, self.net = self.loadYOLO(self.weights, self.config)
+        self.setPreferences()
+        # Resolved once here instead of on every frame
+        self.output_layers = self.net.getUnconnectedOutLayersNames()
+
+    @staticmethod
+    def modelPath(name):
+        """Bare file names are looked up inside the YOLOFiles folder"""
+        return name if os.path.dirname(name) else os.path.join(YOLO_DIR, name)
+
+    @staticmethod
+    def loadYOLO(weights, config):
+        """Load the YOLO files"""
+        # Load classes
+        with open(os.path.join(YOLO_DIR, "coco.names"), 'r') as f:
+            classes = [line.strip() for line in f.readlines()]
+
+        # Load YOLO model
+        net = cv2.dnn.readNet(weights, config)
+        return classes, net
+
+    def setPreferences(self):
+        """Apply the backend and target, falling back to plain CPU if FP16 is not available"""
+        target = TARGETS[self.target]
+        if target is None:
+            print(f"Target '{self.target}' is not supported by this OpenCV build, using 'cpu' instead.")
+            self.target, target = "cpu", TARGETS["cpu"]
+
+        self.net.setPreferableBackend(BACKENDS[self.backend])
+        self.net.setPreferableTarget(target)
+
+    def name(self):
+        """Short label used when comparing configurations"""
+        return f"{os.path.basename(self.weights)}@{self.size}/{self.backend}/{self.target}"
+
+    def detect(self, image):
+        """Returns the [x, y, w, h] box of the player in an RGB image, or None if no player is found"""
+        return self.detectBatch([image])[0]
+
+    def detectBatch(self, images):
+        """Runs one forward pass over several RGB images and returns the player box of each (or None)"""
+
+        self.net.setInput(cv2.dnn.blobFromImages(images, 0.00392, (self.size, self.size), (0, 0, 0),
+                                                 swapRB=True, crop=False))
+        outs = self.net.forward(self.output_layers)
+        # Batched YOLO outputs are (images, rows, values), or the rows of all images stacked in one array
+        outs = [out.reshape(len(images), -1, out.shape[-1]) for out in outs]
+        return [self.bestBox([out[i] for out in outs], image) for i, image in enumerate(images)]
+
+    @staticmethod
+    def bestBox(outs, image):
+        """Picks the player box from the YOLO outputs of one image"""
+
+        # Analyze detections
+        class_ids = []
+        confidences = []
+        boxes = []
+        Width = image.shape[1]
+        Height = image.shape[0]
+        for out in outs:
+            for detection in out:
+                scores = detection[5:]
+                class_id = np.argmax(scores)
+                confidence = scores[class_id]
+                if confidence > 0.5:  # Increased confidence threshold
+                    center_x = int(detection[0] * Width)
+                    center_y = int(detection[1] * Height)
+                    w = int(detection[2] * Width)
+                    h = int(detection[3] * Height)
+                    x = center_x - w // 2  # Ensure integer indices
+                    y = center_y - h // 2  # Ensure integer indices
+                    class_ids.append(class_id)
+                    confidences.append(float(confidence))
+                    boxes.append([x, y, w, h])
+
+        indices = cv2.dnn.NMSBoxes(boxes, confidences, 0.5, 0.4)  # Adjusted NMS threshold
+
+        # Select the best bounding box for the player based on size, aspect ratio, and proximity to center
+        best_box = None
+        largest_area = 0
+        center_x, center_y = Width // 2, Height // 2
+
+        if len(indices) > 0:
+            for i in np.array(indices).flatten():
+                if class_ids[i] == 0:  # Check if the detected class is 'person'
+                    box = boxes[i]
+                    x, y, w, h = box
+                    area = w * h
+                    aspect_ratio = h / w
+
+                    # Filtering conditions
+                    if aspect_ratio > 1.2 and 0.5 * Width * Height > area > 0.02 * Width * Height:
+                        box_center_x = x + w // 2
+                        box_center_y = y + h // 2
+                        distance_to_center = np.sqrt((box_center_x - center_x) ** 2 + (box_center_y - center_y) ** 2)
+                        if area > largest_area and distance_to_center < max(Width, Height) / 2:
+                            largest_area = area
+                            best_box = box
+
+        return best_box
+
+    @staticmethod
+    def cropBox(box, Width, Height):
+        """Grows the player box so the crop keeps some space around the player"""
+
+        x, y, w, h = box
+        x, y = max(0, x), max(0, y)  # Ensure x and y are not negative
+
+        # Increase width and height by 35% in total
+        w_increase = int(w * 0.35)
+        h_increase = int(h * 0.35)
+
+        # Adjust the coordinates to maintain the center position
+        x = max(0, x - w_increase // 2)
+        y = max(0, y - h_increase // 2)
+        w += w_increase
+        h += h_increase
+
+        # Ensure that the new bounding box remains within the boundaries of the original image
+        w = min(w, Width - x)
+        h = min(h, Height - y)
+        return x, y, w, h
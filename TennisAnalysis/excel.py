@@ -1,5 +1,9 @@
 import os
+from copy import copy
+import pandas as pd
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import MergedCell
 from openpyxl.styles import Alignment, Border, Side
 from openpyxl.utils import column_index_from_string as cl, get_column_letter
 
@@ -150,7 +154,6 @@ class ExcelSave:
 
 
 def sheetSetup(frame, filename, side, df):
-    side = side.title()
     try:
         wb = load_workbook(filename)
     except FileNotFoundError:
@@ -161,6 +164,27 @@ def sheetSetup(frame, filename, side, df):
     else:
         sheet = wb.create_sheet("P-FOS")
 
+    processedHeader(sheet, frame, side)
+
+    row = sheet.max_row + 1
+    for index, df_row in df.iterrows():
+        sheet.cell(row=row, column=2).value = df_row.name
+        for i, val in enumerate(df_row, start=3):
+            sheet.cell(row=row, column=i).value = val
+        sheet.cell(row=row, column=2).border = Border(left=Side(style='thin'), right=Side(style='thin'))
+        for i in range(3, 60 + 1, 3):
+            sheet.cell(row=row, column=2 + i).border = Border(right=Side(style='thin'))
+        for i in range(15, 60 + 1, 15):
+            sheet.cell(row=row, column=2 + i).border = Border(right=Side(style='thick'))
+        row += 1
+
+    wb.save(filename=f"{filename}")
+
+
+def processedHeader(sheet, frame, side):
+    """Headers of the P-FOF and P-FOS sheets holding the original, rounded and deviation columns"""
+    side = side.title()
+
     sheet['B2'] = f"P-Frame of {frame.title()}"
     sheet.merge_cells('B2:BJ3')
     sheet['B2'].alignment = Alignment(horizontal='center', vertical='center')
@@ -248,16 +272,131 @@ def sheetSetup(frame, filename, side, df):
     for col in range(2, 23):
         sheet.column_dimensions[chr(64 + col)].width = 9
 
-    row = sheet.max_row + 1
+
+def summarySheet(filename, df):
+    """Writes the per view and joint statistics of CreateDF.summary into a Summary sheet"""
+    try:
+        wb = load_workbook(filename)
+    except FileNotFoundError:
+        print("Error: Excel sheet not found")
+        return
+    if "Summary" in wb.sheetnames:
+        del wb["Summary"]
+    sheet = wb.create_sheet("Summary")
+    summaryHeader(sheet, df.columns)
+
+    row = 6
     for index, df_row in df.iterrows():
-        sheet.cell(row=row, column=2).value = df_row.name
-        for i, val in enumerate(df_row, start=3):
-            sheet.cell(row=row, column=i).value = val
-        sheet.cell(row=row, column=2).border = Border(left=Side(style='thin'), right=Side(style='thin'))
-        for i in range(3, 60 + 1, 3):
-            sheet.cell(row=row, column=2 + i).border = Border(right=Side(style='thin'))
-        for i in range(15, 60 + 1, 15):
-            sheet.cell(row=row, column=2 + i).border = Border(right=Side(style='thick'))
+        for i, val in enumerate([*index, *df_row], start=2):
+            sheet.cell(row=row, column=i).value = None if pd.isna(val) else val
         row += 1
 
     wb.save(filename=f"{filename}")
+
+
+def summaryHeader(sheet, columns):
+    """Headers of the Summary sheet"""
+    last = get_column_letter(4 + len(columns))
+    sheet['B2'] = "Summary"
+    sheet.merge_cells(f'B2:{last}3')
+    sheet['B2'].alignment = Alignment(horizontal='center', vertical='center')
+    for row in sheet.iter_rows(min_row=2, max_row=3, min_col=2, max_col=cl(last)):
+        for cell in row:
+            cell.border = Border(top=Side(style='thin'), bottom=Side(style='thin'))
+
+    for i, label in enumerate(["Frame", "View", "Joint", *columns], start=2):
+        sheet.cell(row=5, column=i).value = label
+        sheet.cell(row=5, column=i).alignment = Alignment(horizontal='center')
+        sheet.cell(row=5, column=i).border = Border(top=Side(style='thin'), bottom=Side(style='thin'))
+
+    for col in range(2, cl(last) + 1):
+        sheet.column_dimensions[get_column_letter(col)].width = 14
+
+
+def streamWorkbook(filename, side, force, stability, pForce, pStability, summary):
+    """Memory-bounded counterpart of ExcelSave, sheetSetup and summarySheet. Writes a new workbook in one pass
+        with write-only sheets. force, stability, pForce and pStability are iterables of DataFrame chunks,
+        so only one chunk is held in memory at a time."""
+
+    fileName = os.path.join(os.path.dirname(__file__), '../AnalyzedAngles/ExcelSheets', f"{filename}.xlsx")
+    os.makedirs(os.path.dirname(fileName), exist_ok=True)
+    prefix, sides = ("LH", ["Left", "Right"]) if side == "left" else ("RH", ["Right", "Left"])
+    wb = Workbook(write_only=True)
+
+    # The headers are built on small regular sheets by the usual functions, then copied over
+    template = Workbook()
+    thick, thin = Side(style='thick'), Side(style='thin')
+
+    frameBorders = {2: Border(left=thick, right=thick), **{2 + 5 * i: Border(right=thick) for i in range(1, 5)}}
+    for chunks, title, header, sheetSide in [(force, f"{prefix}FOF", "Frame Of Force", sides[0]),
+                                             (stability, f"{prefix}FOS", "Frame Of Stability", sides[1])]:
+        sheet = template.create_sheet()
+        ExcelSave.create_sheet(sheet, title, header=header, side=sheetSide)
+        ws = copyHeader(wb, sheet)
+        styles = rowStyles(ws, frameBorders)
+        for chunk in chunks:
+            for name, values in zip(chunk.index, chunk.itertuples(index=False)):
+                ws.append(streamRow(ws, [name, *values], styles))
+
+    processedBorders = {2: Border(left=thin, right=thin),
+                        **{2 + i: Border(right=thin) for i in range(3, 60 + 1, 3)},
+                        **{2 + i: Border(right=thick) for i in range(15, 60 + 1, 15)}}
+    for chunks, title, frame, sheetSide in [(pForce, "P-FOF", "force", sides[0]),
+                                            (pStability, "P-FOS", "stable", sides[1])]:
+        sheet = template.create_sheet(title)
+        processedHeader(sheet, frame, sheetSide)
+        ws = copyHeader(wb, sheet)
+        styles = rowStyles(ws, processedBorders)
+        for chunk in chunks:
+            for name, values in zip(chunk.index, chunk.itertuples(index=False)):
+                ws.append(streamRow(ws, [name, *values], styles))
+
+    sheet = template.create_sheet("Summary")
+    summaryHeader(sheet, summary.columns)
+    ws = copyHeader(wb, sheet)
+    for index, df_row in summary.iterrows():
+        ws.append([None, *[None if pd.isna(val) else val for val in [*index, *df_row]]])
+
+    wb.save(fileName)
+
+
+def copyHeader(wb, template):
+    """Copies the cells, styles, merges and column widths of a regular sheet into a new write-only sheet"""
+    ws = wb.create_sheet(template.title)
+    for key, dimension in template.column_dimensions.items():
+        ws.column_dimensions[key].width = dimension.width
+    for merged in template.merged_cells.ranges:
+        ws.merged_cells.add(merged.coord)
+
+    for row in template.iter_rows(min_row=1, max_row=template.max_row):
+        cells = []
+        for cell in row:
+            new = WriteOnlyCell(ws, None if isinstance(cell, MergedCell) else cell.value)
+            if cell.has_style:
+                new.border = copy(cell.border)
+                new.alignment = copy(cell.alignment)
+                new.font = copy(cell.font)
+            cells.append(new)
+        ws.append(cells)
+    return ws
+
+
+def rowStyles(ws, borders):
+    """Registers the border of each column once, so the rows only copy the style ids"""
+    styles = {}
+    for col, border in borders.items():
+        cell = WriteOnlyCell(ws)
+        cell.border = border
+        styles[col] = cell._style
+    return styles
+
+
+def streamRow(ws, values, styles):
+    """Builds a write-only row starting at column B, with the styles of rowStyles given per column number"""
+    row = [None, *values]
+    for col, style in styles.items():
+        cell = WriteOnlyCell(ws, row[col - 1])
+        # Looking the border up in the workbook for every cell is what makes large sheets slow
+        cell._style = copy(style)
+        row[col - 1] = cell
+    return row
@@ -0,0 +1,88 @@
+"""One file per session holding every cropped frame as raw uint8 RGB pixels.
+
+Layout: the frames back to back, then a JSON index with the name, offset and shape of each frame,
+then a footer with the index offset and a magic string. Reading memory-maps the file, so each frame
+is a zero-copy array view and reruns only touch the page cache."""
+
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"TAFRAMES"
+FOOTER = struct.Struct("<Q8s")
+
+
+class FrameWriter:
+    """Writes frames one by one into a packed frame file. The frames go to a '.part' file that only
+        replaces path once close() has written the index, so a failed run never leaves a store that
+        looks complete."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.file = open(self.part_path, "wb")
+        self.index = []
+
+    def add(self, name, image):
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        self.index.append({"name": name, "offset": self.file.tell(), "shape": list(image.shape)})
+        self.file.write(image.data)
+
+    def close(self):
+        index_offset = self.file.tell()
+        self.file.write(json.dumps(self.index).encode())
+        self.file.write(FOOTER.pack(index_offset, MAGIC))
+        self.file.close()
+        os.replace(self.part_path, self.path)
+
+    def abort(self):
+        """Drops the frames written so far, an existing store at path is left untouched"""
+        self.file.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class FrameStore:
+    """Read-only access to a packed frame file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        index_offset, magic = FOOTER.unpack(self.data[-FOOTER.size:].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a packed frame file")
+        index = json.loads(self.data[index_offset:-FOOTER.size].tobytes())
+        self.frames = {frame["name"]: (frame["offset"], tuple(frame["shape"])) for frame in index}
+
+    @property
+    def names(self):
+        """Frame names in the order they were written"""
+        return list(self.frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __contains__(self, name):
+        return name in self.frames
+
+    def __getitem__(self, name):
+        """Returns the frame as a read-only view into the memory map"""
+        offset, shape = self.frames[name]
+        return self.data[offset:offset + int(np.prod(shape))].reshape(shape)
+
+    def items(self):
+        for name in self.frames:
+            yield name, self[name]
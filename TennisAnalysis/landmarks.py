@@ -0,0 +1,40 @@
+import cv2
+import mediapipe as mp
+
+mp_pose = mp.solutions.pose
+
+
+def createPose():
+    """Creates the MediaPipe Pose model used for every frame"""
+    return mp_pose.Pose(static_image_mode=True, enable_segmentation=False, min_detection_confidence=0.8,
+                        model_complexity=2)
+
+
+def extractLandmarks(pose, img_rgb):
+    """Runs the pose model on an RGB image. Returns the flat [x, y, z, x, y, z, ...] landmark list in
+        image coordinates (empty if no pose was found) and the MediaPipe results for drawing."""
+
+    posList = []
+    results = pose.process(img_rgb)
+
+    # Apply background subtraction
+    backSub = cv2.createBackgroundSubtractorMOG2()
+    fg_mask = backSub.apply(img_rgb)
+
+    # Find contours and crop the image to the largest contour
+    contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if contours:
+        largest_contour = max(contours, key=cv2.contourArea)
+        x, y, w, h = cv2.boundingRect(largest_contour)
+        cropped_image = img_rgb[y:y + h, x:x + w]
+
+        # Process the cropped image with MediaPipe Pose
+        results = pose.process(cropped_image)
+
+        # Convert landmarks to original image coordinates
+        if results.pose_landmarks:
+            for lm in results.pose_landmarks.landmark:
+                cx, cy, cz = int(lm.x * w) + x, int(lm.y * h) + y, int(lm.z * w)
+                posList.extend([cx, cy, cz])
+
+    return posList, results
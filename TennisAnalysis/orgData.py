@@ -1,19 +1,31 @@
 import os
 import pandas as pd
-from TennisAnalysis import compute
+from TennisAnalysis import compute, excel
+from TennisAnalysis.stats import RunningStats
+
+
+# Rough memory cost of one picture's rows, including the pandas copies made while spilling and exporting
+ROW_BYTES = 4096
 
 
 class CreateDF:
-    def __init__(self, side, filename):
+    def __init__(self, side, filename, memory_budget=None):
+        """With a memory_budget in bytes, rows are spilled to the CSV files in chunks instead of being kept
+            in FOF and FOS, and the exports stream from those files."""
         self.views = ["FrontView", "TopView", "SideView", "NormView"]
         self.labels = ["Elbow", "Shoulder", "UpHip", "DownHip", "Knee"]
         self.values = {"left": "right", "up": "down"}
         self.values = {**self.values, **{v: k for k, v in self.values.items()}}
-        self.folder = self.create_folder(filename)
+        # The folder is only created once something is written, so CreateDF can be used for calculations alone
+        self.folder = os.path.join(os.path.dirname(__file__), '../AnalyzedAngles/CSVFiles', filename)
         self.filename = filename
         self.force = side
         self.stability = self.values[side]
         self.FOF, self.FOS = self.createDf()
+        self.stats = {"force": RunningStats(len(self.FOF.columns)), "stability": RunningStats(len(self.FOS.columns))}
+        self.chunk_rows = None if memory_budget is None else max(1, int(memory_budget // ROW_BYTES))
+        self.buffer = []
+        self.spilled = False
 
     @staticmethod
     def create_folder(foldername):
@@ -44,16 +56,62 @@ class CreateDF:
         df.columns = pd.MultiIndex.from_tuples(new_columns)
         return df
 
+    def csv_paths(self):
+        return os.path.join(self.folder, f"forceFrame.csv"), os.path.join(self.folder, f"stabilityFrame.csv")
+
     def add_values(self, index_name, lt):
-        self.FOF.loc[index_name] = lt[0]
-        self.FOS.loc[index_name] = lt[1]
+        if self.chunk_rows is None:
+            self.FOF.loc[index_name] = lt[0]
+            self.FOS.loc[index_name] = lt[1]
+        else:
+            self.buffer.append((index_name, lt[0], lt[1]))
+            if len(self.buffer) >= self.chunk_rows:
+                self.spill()
+        self.stats["force"].add(lt[0])
+        self.stats["stability"].add(lt[1])
+
+    def spill(self):
+        """Appends the buffered rows to the CSV files and frees them"""
+        self.create_folder(self.filename)
+        names = [row[0] for row in self.buffer]
+        for i, (df, path) in enumerate(zip([self.FOF, self.FOS], self.csv_paths()), start=1):
+            chunk = pd.DataFrame([row[i] for row in self.buffer], index=names, columns=df.columns)
+            chunk.to_csv(path, mode='a' if self.spilled else 'w', header=not self.spilled)
+        self.spilled = True
+        self.buffer = []
+
+    def chunks(self, path):
+        """Reads a CSV written by this class back in chunks of chunk_rows"""
+        return pd.read_csv(path, header=[0, 1], index_col=0, chunksize=self.chunk_rows)
+
+    def summary(self):
+        """Running statistics of every view and joint, available at any point during the capture"""
+        frames = []
+        for frame, df in [("force", self.FOF), ("stability", self.FOS)]:
+            index = pd.MultiIndex.from_tuples([(frame, view, label) for view, label in df.columns],
+                                              names=["frame", "view", "joint"])
+            frames.append(pd.DataFrame(self.stats[frame].summary(), index=index))
+        return pd.concat(frames)
 
     def save_as_csv(self):
-        force_file_path = os.path.join(self.folder, f"forceFrame.csv")
-        stability_file_path = os.path.join(self.folder, f"stabilityFrame.csv")
-        self.FOF.to_csv(force_file_path)
-        self.FOS.to_csv(stability_file_path)
-        compute.Compute("force", self.filename, self.force, force_file_path)
-        compute.Compute("stable", self.filename, self.stability, stability_file_path)
+        self.create_folder(self.filename)
+        force_file_path, stability_file_path = self.csv_paths()
+        if self.chunk_rows is None:
+            self.FOF.to_csv(force_file_path)
+            self.FOS.to_csv(stability_file_path)
+        elif self.buffer or not self.spilled:
+            self.spill()
+        force = compute.Compute("force", self.filename, self.force, force_file_path, chunksize=self.chunk_rows)
+        stability = compute.Compute("stable", self.filename, self.stability, stability_file_path,
+                                    chunksize=self.chunk_rows)
+
+        summary = self.summary()
+        summary.to_csv(os.path.join(self.folder, "summary.csv"))
+        if self.chunk_rows is None:
+            excel.summarySheet(os.path.join(
+                os.path.dirname(__file__), '../AnalyzedAngles/ExcelSheets', f"{self.filename}.xlsx"), summary)
+        else:
+            excel.streamWorkbook(self.filename, self.force, self.chunks(force_file_path),
+                                 self.chunks(stability_file_path), force.chunks(), stability.chunks(), summary)
 
 
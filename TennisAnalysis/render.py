@@ -0,0 +1,103 @@
+"""Renders the 3D plot of Angle.createPlot for every frame of a session straight into a video file.
+The figure and its artists are created once with the non-interactive Agg backend. Each frame only
+moves the points and lines, and the static axes are restored from a cached background."""
+
+import cv2
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+from .angle import ANGLES, COLORS
+
+
+def flatPoints(posList):
+    """Array version of Angle.flatValues. Returns the norm, x_flat, y_flat and z_flat point arrays."""
+    norm = np.asarray(posList, dtype=float).reshape(-1, 3) / 10
+    c = 1.2 * np.max(posList) / 10
+    flats = []
+    for axis in range(3):
+        flat = norm.copy()
+        flat[:, axis] = c
+        flats.append(flat)
+    return norm, flats[0], flats[1], flats[2]
+
+
+class PlotRenderer:
+    """Streams 3D skeleton plots into a video file.
+        limits is ((xmin, xmax), (ymin, ymax), (zmin, zmax)); the axes stay fixed for the whole video."""
+
+    def __init__(self, video_file, limits, fps=30, figsize=(6.4, 4.8), dpi=100):
+        self.video_file = video_file
+        self.fps = fps
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot(111, projection='3d')
+
+        self.ax.set_xlim(*limits[0])
+        self.ax.set_ylim(*limits[1])
+        self.ax.set_zlim(*limits[2])
+        self.ax.set_xlabel('X Label')
+        self.ax.set_ylabel('Y Label')
+        self.ax.set_zlabel('Z Label')
+        self.ax.set_title('3D Scatter Plot')
+
+        # One scatter for the 4 point sets and one collection for all segments keeps the per-frame
+        # matplotlib overhead low. They are animated so the cached background only holds the axes.
+        self.scatter = self.ax.scatter(np.zeros(4 * 33), np.zeros(4 * 33), np.zeros(4 * 33),
+                                       c=np.repeat(['r', 'g', 'b', 'k'], 33), marker='o', depthshade=False,
+                                       animated=True)
+        self.segments = [(points[i], points[i + 1]) for points in ANGLES for i in range(len(points) - 1)]
+        self.lines = Line3DCollection(np.zeros((len(self.segments), 2, 3)), colors=np.repeat(COLORS, 2), animated=True)
+        self.ax.add_collection3d(self.lines)
+
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        width, height = self.canvas.get_width_height()
+        self.writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+
+    def addFrame(self, norm, x_flat, y_flat, z_flat):
+        """Draws one frame from the four (33, 3) point arrays and writes it to the video"""
+
+        points = np.concatenate([x_flat, y_flat, z_flat, norm])
+        self.scatter._offsets3d = (points[:, 0], points[:, 1], points[:, 2])
+        self.lines.set_segments(z_flat[self.segments])
+
+        self.canvas.restore_region(self.background)
+        for artist in [self.scatter, self.lines]:
+            artist.do_3d_projection()
+            self.ax.draw_artist(artist)
+
+        frame = np.asarray(self.canvas.buffer_rgba())
+        self.writer.write(cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR))
+
+    def addLandmarks(self, posList):
+        """Draws one frame from a landmark list as produced by extractLandmarks"""
+        self.addFrame(*flatPoints(posList))
+
+    def close(self):
+        self.writer.release()
+
+
+def plotLimits(landmarks):
+    """Axis limits that fit every frame of a session"""
+    if not landmarks:
+        raise ValueError("No landmarks to fit the axes to")
+    points = np.concatenate([np.concatenate(flatPoints(posList)) for posList in landmarks])
+    low, high = points.min(axis=0), points.max(axis=0)
+    margin = 0.05 * (high - low)
+    return tuple(zip(low - margin, high + margin))
+
+
+def renderVideo(landmarks, video_file, fps=30, **kwargs):
+    """Renders a list of landmark lists (frames without a pose are skipped) into a video file.
+        Returns the number of frames written; no video file is created when no frame has a pose."""
+    landmarks = [posList for posList in landmarks if posList]
+    if not landmarks:
+        return 0
+    renderer = PlotRenderer(video_file, plotLimits(landmarks), fps=fps, **kwargs)
+    try:
+        for posList in landmarks:
+            renderer.addLandmarks(posList)
+    finally:
+        renderer.close()
+    return len(landmarks)
@@ -0,0 +1,263 @@
+"""Long-running local service that keeps the YOLO detector and MediaPipe Pose loaded between jobs.
+Start it with `python -m TennisAnalysis.service` and send jobs with the thin client in client.py.
+
+A job is a JSON object posted to /process:
+    {"folder": "CroppedImages/...", "side": "right"}                  frames read from a folder
+    {"frames": [{"name": "001.jpg", "image": "<base64>"}], "side": ...}   encoded images sent inline
+Optional keys: "preprocess" crops the player with the detector first, "session" names the session
+and "save" writes the Excel and CSV files for it like main.py does. Without "save" nothing is written.
+The side and session default to what main.py uses for the folder ('-R' is right-handed,
+'Serve Dataset/Swiatek-R'); inline frames need a side.
+
+The models are owned by a single worker thread. Between batches it picks up newly queued jobs and
+fills each batch with frames from all of them, so concurrent "preprocess" jobs share the YOLO
+forward passes (--batch-size frames at a time)."""
+
+import argparse
+import base64
+import json
+import os
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+from .angle import Angle
+from .detector import Detector
+from .landmarks import createPose, extractLandmarks
+from .shard import sessionName, sideOf
+
+
+class InferenceService:
+    """Owns the models and runs the queued jobs on a single worker thread. Frames of every active job are
+        interleaved into batches of batch_size, so the YOLO crops of concurrent "preprocess" jobs share one
+        forward pass. MediaPipe Pose has no batch call and still runs frame by frame."""
+
+    def __init__(self, batch_size=16, **kwargs):
+        """Extra keyword arguments configure the Detector"""
+        self.batch_size = batch_size
+        self.detector = Detector(**kwargs)
+        self.pose = createPose()
+        self.jobs = queue.Queue()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, request):
+        """Queues a job and waits for its result"""
+        job = {"request": request, "done": threading.Event(), "result": None}
+        self.jobs.put(job)
+        job["done"].wait()
+        return job["result"]
+
+    def run(self):
+        """Worker loop: picks up new jobs between batches and finishes the jobs whose frames are done"""
+        active = []
+        while True:
+            # Only block when no job is in progress
+            if not active:
+                self.start(self.jobs.get(), active)
+            while True:
+                try:
+                    self.start(self.jobs.get_nowait(), active)
+                except queue.Empty:
+                    break
+            self.step(self.nextBatch(active))
+            self.finishDone(active)
+
+    def process(self, request):
+        """Runs one job on the calling thread and returns its result"""
+        job = {"request": request, "done": threading.Event(), "result": None}
+        active = []
+        self.start(job, active)
+        while active:
+            self.step(self.nextBatch(active))
+            self.finishDone(active)
+        return job["result"]
+
+    @staticmethod
+    def readFrames(request):
+        """Yields (name, RGB image) pairs from a folder or from base64 encoded images"""
+        if "folder" in request:
+            for image_file in sorted(os.listdir(request["folder"])):
+                if image_file.endswith(('.jpg', '.jpeg', '.png')):
+                    img = cv2.imread(os.path.join(request["folder"], image_file))
+                    yield image_file, cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        else:
+            for frame in request["frames"]:
+                buffer = np.frombuffer(base64.b64decode(frame["image"]), dtype=np.uint8)
+                img = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+                yield frame["name"], cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    @staticmethod
+    def fail(job, error):
+        job["result"] = {"error": f"{type(error).__name__}: {error}"}
+        job["done"].set()
+
+    def start(self, job, active):
+        """Checks the request and adds the job to the active ones, or fails it right away"""
+        request = job["request"]
+        try:
+            if "folder" in request and not os.path.isdir(request["folder"]):
+                raise FileNotFoundError(f"No such folder: {request['folder']}")
+            if request.get("side"):
+                side = request["side"].lower()
+            elif "folder" in request:
+                # Same rule as main.py and runShard: a '-R' folder is right-handed
+                side = sideOf(request["folder"])
+            else:
+                raise ValueError("side is required for inline frames")
+            if side not in ("left", "right"):
+                raise ValueError(f"side must be 'left' or 'right', got {request.get('side')!r}")
+        except Exception as error:
+            self.fail(job, error)
+            return
+
+        job["session"] = request.get("session") or (sessionName(request["folder"]) if "folder" in request
+                                                    else "Service")
+        # CreateDF only writes when the job is saved
+        job["angFunc"] = Angle(filename=job["session"], side=side)
+        job["frames"] = self.readFrames(request)
+        job["results"] = []
+        job["read"] = False
+        job["error"] = None
+        active.append(job)
+
+    def nextBatch(self, active):
+        """Takes frames round-robin from the active jobs until the batch is full or every job is read"""
+        batch = []
+        reading = [job for job in active if not job["read"] and job["error"] is None]
+        while reading and len(batch) < self.batch_size:
+            for job in list(reading):
+                try:
+                    name, image = next(job["frames"])
+                except StopIteration:
+                    job["read"] = True
+                    reading.remove(job)
+                    continue
+                except Exception as error:
+                    job["error"] = error
+                    reading.remove(job)
+                    continue
+                batch.append((job, name, image))
+                if len(batch) == self.batch_size:
+                    break
+        return batch
+
+    def step(self, batch):
+        """Crops the frames of "preprocess" jobs in one detector pass, then adds the landmarks and angles"""
+        crops = [i for i, (job, _, _) in enumerate(batch) if job["request"].get("preprocess")]
+        if crops:
+            try:
+                boxes = self.detector.detectBatch([batch[i][2] for i in crops])
+            except Exception as error:
+                for i in crops:
+                    batch[i][0]["error"] = error
+            else:
+                for i, box in zip(crops, boxes):
+                    job, name, image = batch[i]
+                    batch[i] = (job, name, self.crop(image, box))
+
+        for job, name, image in batch:
+            if job["error"] is not None or image is None:
+                continue
+            try:
+                self.addFrame(job, name, image)
+            except Exception as error:
+                job["error"] = error
+
+    def crop(self, image, box):
+        """Crops the player like ROI does, without writing the crop to disk"""
+        if box is None:
+            return None
+        x, y, w, h = self.detector.cropBox(box, image.shape[1], image.shape[0])
+        person_image = image[y:y + h, x:x + w]
+        return person_image if person_image.shape[0] > 0 and person_image.shape[1] > 0 else None
+
+    def addFrame(self, job, name, image):
+        """Adds the landmarks and angle rows of one frame to the job"""
+        angFunc = job["angFunc"]
+        posList, _ = extractLandmarks(self.pose, image)
+        frame = {"name": name, "landmarks": posList, "force": None, "stability": None}
+        job["results"].append(frame)
+        try:
+            angFunc.calculate(posList)
+        except IndexError:
+            return
+
+        frame["force"], frame["stability"] = angFunc.rows()
+        if job["request"].get("save"):
+            angFunc.save_values(name)
+
+    def finishDone(self, active):
+        """Saves and answers the jobs that failed or whose frames are all processed"""
+        for job in [job for job in active if job["read"] or job["error"] is not None]:
+            active.remove(job)
+            if job["error"] is not None:
+                self.fail(job, job["error"])
+                continue
+            angFunc = job["angFunc"]
+            try:
+                if job["request"].get("save"):
+                    angFunc.save_files()
+            except Exception as error:
+                self.fail(job, error)
+                continue
+            job["result"] = {"session": job["session"],
+                             "columns": {"force": [list(col) for col in angFunc.df.FOF.columns],
+                                         "stability": [list(col) for col in angFunc.df.FOS.columns]},
+                             "frames": job["results"]}
+            job["done"].set()
+
+
+class Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_POST(self):
+        if self.path != "/process":
+            self.send_error(404)
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if not isinstance(request, dict) or ("folder" not in request and "frames" not in request):
+                raise ValueError("expected a JSON object with 'folder' or 'frames'")
+        except (TypeError, ValueError) as error:
+            self.reply(400, {"error": f"Bad request: {error}"})
+            return
+
+        result = self.service.submit(request)
+        self.reply(500 if "error" in result else 200, result)
+
+    def reply(self, status, result):
+        body = json.dumps(result).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8765, **kwargs):
+    """Loads the models once and serves jobs until interrupted"""
+    Handler.service = InferenceService(**kwargs)
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving on http://{host}:{port}/process")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the detector and pose models loaded between jobs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-size", type=int, default=16, help="frames per detector forward pass")
+    args = parser.parse_args()
+    serve(args.host, args.port, batch_size=args.batch_size)
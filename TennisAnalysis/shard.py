@@ -0,0 +1,145 @@
+"""Splits the pose stage of a session across machines and merges the partial results.
+
+    python -m TennisAnalysis.shard run FOLDER --shard 0 --shards 4 --output part0.json
+    python -m TennisAnalysis.shard merge part0.json part1.json part2.json part3.json
+
+Each shard writes the landmarks and angle rows of its frames. The merge replays the rows in frame order
+into one Angle and saves the Excel and CSV files once, so the output matches a run of main.py."""
+
+import argparse
+import hashlib
+import json
+import os
+
+import cv2
+from .angle import Angle
+from .landmarks import createPose, extractLandmarks
+
+
+def imageFiles(folder):
+    """Frames of a session in the order main.py processes them"""
+    return [f for f in sorted(os.listdir(folder)) if f.endswith(('.jpg', '.jpeg', '.png'))]
+
+
+def framesDigest(image_files):
+    """Fingerprint of the full frame list, so the merge can tell the shards saw the same folder"""
+    return hashlib.sha1("\n".join(image_files).encode()).hexdigest()
+
+
+def sessionName(folder):
+    """Session name main.py uses for a folder: 'Tennis Dataset/Serve Dataset/Swiatek-R' and
+        'CroppedImages/CroppedServe Dataset/Swiatek-R' both give 'Serve Dataset/Swiatek-R'.
+        A folder without a parent like './Swiatek-R' gives just 'Swiatek-R'."""
+    parts = [part for part in os.path.normpath(folder).split(os.sep) if part]
+    if len(parts) < 2:
+        return parts[-1]
+    dataset, player = parts[-2:]
+    if dataset.startswith("Cropped"):
+        dataset = dataset[len("Cropped"):]
+    return f"{dataset}/{player}"
+
+
+def sideOf(folder):
+    """Playing side main.py uses for a folder: '...-R' is right-handed, anything else left-handed"""
+    return "right" if os.path.normpath(folder)[-1].lower() == "r" else "left"
+
+
+def shardFrames(image_files, shards):
+    """Splits the frames into contiguous shards whose sizes differ by at most one"""
+    size, extra = divmod(len(image_files), shards)
+    parts, start = [], 0
+    for i in range(shards):
+        end = start + size + (i < extra)
+        parts.append(image_files[start:end])
+        start = end
+    return parts
+
+
+def runShard(folder, shard, shards, output_file, side=None, session=None):
+    """Processes one shard of the frames in a folder and writes the partial result as JSON"""
+
+    if not 0 <= shard < shards:
+        raise ValueError(f"Shard {shard} is outside 0-{shards - 1}")
+
+    side = side or sideOf(folder)
+    session = session or sessionName(folder)
+    image_files = imageFiles(folder)
+    frames = shardFrames(image_files, shards)[shard]
+
+    pose = createPose()
+    angFunc = Angle(filename=session, side=side)
+    landmarks, rows = {}, []
+    for image_file in frames:
+        img = cv2.imread(os.path.join(folder, image_file))
+        posList, _ = extractLandmarks(pose, cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        landmarks[image_file] = posList
+        try:
+            angFunc.calculate(posList)
+        except IndexError:
+            continue
+        rows.append([image_file, *angFunc.rows()])
+
+    with open(output_file, "w") as f:
+        json.dump({"session": session, "side": side, "shard": shard, "shards": shards,
+                   "total": len(image_files), "digest": framesDigest(image_files),
+                   "frames": frames, "landmarks": landmarks, "rows": rows}, f)
+
+
+def mergeShards(files, database=None, memory_budget=None):
+    """Combines the partial results of every shard and saves the session like main.py does.
+        memory_budget spills the rows to disk like in main.py, which keeps long sessions fast and small.
+        Returns the Angle holding the merged rows."""
+
+    if not files:
+        raise ValueError("No shard files given")
+    parts = []
+    for file in files:
+        with open(file) as f:
+            parts.append(json.load(f))
+
+    first = parts[0]
+    run = ("session", "side", "shards", "total", "digest")
+    for part in parts:
+        if [part[key] for key in run] != [first[key] for key in run]:
+            raise ValueError(f"Shard {part['shard']} belongs to a different run than shard {first['shard']}")
+    found = sorted(part["shard"] for part in parts)
+    if found != list(range(first["shards"])):
+        raise ValueError(f"Expected shards 0-{first['shards'] - 1}, got {found}")
+
+    parts.sort(key=lambda p: p["shard"])
+    frames = [image_file for part in parts for image_file in part["frames"]]
+    if len(frames) != first["total"] or framesDigest(frames) != first["digest"]:
+        raise ValueError(f"The shards cover {len(frames)} frames that do not match the {first['total']} "
+                         f"frames of the session")
+
+    angFunc = Angle(filename=first["session"], side=first["side"], memory_budget=memory_budget)
+    for part in parts:
+        for image_file, force, stability in part["rows"]:
+            angFunc.df.add_values(image_file, [force, stability])
+
+    angFunc.save_files(database)
+    return angFunc
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split a session across machines and merge the results")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="process one shard of a folder")
+    run.add_argument("folder")
+    run.add_argument("--shard", type=int, required=True)
+    run.add_argument("--shards", type=int, required=True)
+    run.add_argument("--output", required=True)
+    run.add_argument("--side")
+    run.add_argument("--session")
+
+    merge = commands.add_parser("merge", help="merge the shard files and save the session")
+    merge.add_argument("files", nargs="+")
+    merge.add_argument("--database", help="also store the rows in this SQLite database")
+    merge.add_argument("--memory-budget", type=int, help="bytes of angle rows to keep in memory before spilling")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        runShard(args.folder, args.shard, args.shards, args.output, side=args.side, session=args.session)
+    else:
+        mergeShards(args.files, database=args.database, memory_budget=args.memory_budget)
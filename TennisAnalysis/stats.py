@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class RunningStats:
+    """Statistics of every angle column, updated one row at a time.
+        Mean and variance use Welford's method. Percentiles come from a fixed histogram over 0-180 degrees,
+        so they are exact to the bin width and memory does not grow with the number of rows."""
+
+    def __init__(self, columns, bin_width=0.1):
+        self.bin_width = bin_width
+        self.bins = int(round(180 / bin_width))
+        self.count = np.zeros(columns, dtype=np.int64)
+        self.mean = np.zeros(columns)
+        self.m2 = np.zeros(columns)
+        self.min = np.full(columns, np.inf)
+        self.max = np.full(columns, -np.inf)
+        self.histogram = np.zeros((columns, self.bins), dtype=np.int64)
+
+    def add(self, row):
+        """Adds one row of angles, missing (NaN) values are skipped"""
+        row = np.asarray(row, dtype=float)
+        valid = np.isfinite(row)
+        if not valid.any():
+            return
+        x = row[valid]
+
+        # Welford update
+        self.count[valid] += 1
+        delta = x - self.mean[valid]
+        self.mean[valid] += delta / self.count[valid]
+        self.m2[valid] += delta * (x - self.mean[valid])
+
+        self.min[valid] = np.minimum(self.min[valid], x)
+        self.max[valid] = np.maximum(self.max[valid], x)
+
+        bins = np.clip((x / self.bin_width).astype(int), 0, self.bins - 1)
+        self.histogram[np.flatnonzero(valid), bins] += 1
+
+    def variance(self):
+        """Sample variance of the raw angles. Unlike var_step of Compute, which is the sample standard
+            deviation of round(angle / 10), it is neither rounded nor scaled."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    def percentile(self, q):
+        """Approximate q-th percentile of every column, interpolated inside the histogram bin"""
+        result = np.full(len(self.count), np.nan)
+        cumulative = np.cumsum(self.histogram, axis=1)
+        for col in np.flatnonzero(self.count):
+            target = q / 100 * self.count[col]
+            b = min(np.searchsorted(cumulative[col], target), self.bins - 1)
+            before = cumulative[col][b - 1] if b > 0 else 0
+            inside = self.histogram[col][b]
+            fraction = (target - before) / inside if inside else 0
+            value = (b + fraction) * self.bin_width
+            result[col] = min(max(value, self.min[col]), self.max[col])
+        return result
+
+    def summary(self, percentiles=(5, 25, 50, 75, 95)):
+        """Returns a dictionary of statistic name to per-column array"""
+        with np.errstate(invalid='ignore'):
+            values = {
+                "count": self.count.copy(),
+                "mean": np.where(self.count > 0, self.mean, np.nan),
+                "variance": self.variance(),
+                "std": np.sqrt(self.variance()),
+                "min": np.where(self.count > 0, self.min, np.nan),
+                "max": np.where(self.count > 0, self.max, np.nan),
+            }
+        for q in percentiles:
+            values[f"p{q}"] = self.percentile(q)
+        return values
@@ -0,0 +1,54 @@
+"""Thin client for the inference service started with `python -m TennisAnalysis.service`.
+Only uses the standard library so a job does not pay for importing OpenCV, MediaPipe or pandas.
+
+Example:
+    python client.py "CroppedImages/CroppedServe Dataset/Swiatek-R" --side right --save"""
+
+import argparse
+import base64
+import json
+import os
+import urllib.error
+import urllib.request
+
+
+def process(request, url="http://127.0.0.1:8765/process"):
+    """Sends a job to the service and returns the decoded result. Failed jobs return {"error": message}."""
+    data = json.dumps(request).encode()
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        body = error.read()
+        try:
+            return json.loads(body)
+        except ValueError:
+            return {"error": f"HTTP {error.code}: {body.decode(errors='replace') or error.reason}"}
+
+
+def encodeFrames(paths):
+    """Packs image files into the inline frame format of the service"""
+    frames = []
+    for path in paths:
+        with open(path, "rb") as f:
+            frames.append({"name": os.path.basename(path), "image": base64.b64encode(f.read()).decode()})
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a folder of frames to the inference service")
+    parser.add_argument("folder")
+    parser.add_argument("--side", help="left or right, by default taken from the folder's -L/-R suffix")
+    parser.add_argument("--session")
+    parser.add_argument("--preprocess", action="store_true", help="crop the player with the detector first")
+    parser.add_argument("--save", action="store_true", help="write the Excel and CSV files")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/process")
+    args = parser.parse_args()
+
+    result = process({"folder": os.path.abspath(args.folder), "side": args.side, "session": args.session,
+                      "preprocess": args.preprocess, "save": args.save}, args.url)
+    if "error" in result:
+        raise SystemExit(f"Error: {result['error']}")
+    found = sum(frame["force"] is not None for frame in result["frames"])
+    print(f"{result['session']}: {found}/{len(result['frames'])} frames with angles")
@@ -5,6 +5,7 @@ which handed the player is."""
 import os
 import cv2
 import TennisAnalysis as Ta
+from TennisAnalysis.landmarks import createPose, extractLandmarks
 import mediapipe as mp
 import warnings
 
@@ -13,57 +14,48 @@ warnings.filterwarnings('ignore', category=UserWarning, module='google.protobuf.
 
 input_folder = "Tennis Dataset/Serve Dataset/Swiatek-R"
 output_folder = f"CroppedImages/{input_folder[15:]}"
+store_file = f"CroppedImages/Cropped{input_folder[15:]}.frames"
+packed = False  # Keep the crops in one memory-mapped frame file instead of separate JPEGs
+memory_budget = None  # Bytes of angle rows to keep in memory before spilling to disk, None keeps all
 
 
 side = "right" if input_folder[-1].lower() == "r" else "left"
 
 if input("Would you like to pre-process the images? Y/N: \n").lower() == 'y':
-    roi = Ta.ROI(input_folder)
+    roi = Ta.ROI(input_folder, packed=packed)
     output_folder = roi.output_folder
+    store_file = roi.store_file
 
 
 mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=True, enable_segmentation=False, min_detection_confidence=0.8, model_complexity=2)
+pose = createPose()
 mp_drawing = mp.solutions.drawing_utils
 
-image_files = sorted(os.listdir(output_folder))
+store = None
+if packed:
+    if not os.path.exists(store_file):
+        raise FileNotFoundError(f"No packed frame file at {store_file}, pre-process the images with packed = True first")
+    store = Ta.FrameStore(store_file)
+image_files = sorted(store.names) if store is not None else sorted(os.listdir(output_folder))
 
-angFunc = Ta.Angle(filename=f"{input_folder[15:]}", side=side)
+angFunc = Ta.Angle(filename=f"{input_folder[15:]}", side=side, memory_budget=memory_budget)
 
 for image_file in image_files:
     # Check if the file is an image (assuming all files in the folder are images)
     posList = []
     if image_file.endswith(('.jpg', '.jpeg', '.png')):
-        # Read the image
-        image_path = os.path.join(output_folder, image_file)
-        img = cv2.imread(image_path)
+        if store is not None:
+            # Read-only view into the frame file, already RGB
+            img_rgb = store[image_file]
+        else:
+            # Read the image
+            image_path = os.path.join(output_folder, image_file)
+            img = cv2.imread(image_path)
 
-        # Process the image
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            # Process the image
+            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
 
-        results = pose.process(img_rgb)
-
-        # Apply background subtraction
-        backSub = cv2.createBackgroundSubtractorMOG2()
-        fg_mask = backSub.apply(img_rgb)
-
-        # Find contours and crop the image to the largest contour
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        if contours:
-            largest_contour = max(contours, key=cv2.contourArea)
-            x, y, w, h = cv2.boundingRect(largest_contour)
-            cropped_image = img_rgb[y:y + h, x:x + w]
-
-            # Process the cropped image with MediaPipe Pose
-            results = pose.process(cropped_image)
-
-            # Draw the pose annotation on the original image
-            if results.pose_landmarks:
-                # Convert landmarks to original image coordinates
-                for lm in results.pose_landmarks.landmark:
-                    cx, cy, cz = int(lm.x * w) + x, int(lm.y * h) + y, int(lm.z * w)
-                    posList.extend([cx, cy, cz])
-                    # cv2.circle()
+        posList, results = extractLandmarks(pose, img_rgb)
 
         try:
             angFunc.calculate(posList)
@@ -77,6 +69,8 @@ for image_file in image_files:
             continue
 
         # Display the processed image (optional)
+        if store is not None:
+            img_rgb = img_rgb.copy()
         mp_drawing.draw_landmarks(img_rgb, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
         imS = cv2.resize(img_rgb, (0, 0), fx=0.4, fy=0.4)
 